@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 from utils.data_manager import DataManager
-from utils.analytics import MoodAnalytics
+from utils.analytics import MoodAnalytics, running_mean
 from utils.visualizations import (
     create_mood_chart, create_mood_distribution, 
     create_weekly_pattern_chart, create_monthly_trend_chart,
@@ -25,6 +26,79 @@ def get_data_manager():
 
 data_manager = get_data_manager()
 
+# Correlation strength labels, indexed by how many edges |correlation| reaches
+STRENGTH_EDGES = np.array([0.1, 0.3, 0.5, 0.7])
+STRENGTH_LABELS = ("Very Weak", "Weak", "Moderate", "Strong", "Very Strong")
+
+def correlation_strength(correlation):
+    return STRENGTH_LABELS[np.searchsorted(STRENGTH_EDGES, abs(correlation), side='right')]
+
+# Cached data, analytics and chart builders. They are keyed on the data file
+# version, so reruns triggered by widget interaction reuse earlier results
+# until a new entry is saved.
+@st.cache_data(ttl=600)
+def get_filtered_data(df_version, start_date, end_date):
+    return data_manager.get_date_range_data(start_date, end_date)
+
+# A shared MoodAnalytics instance memoizes each analysis it has computed
+@st.cache_resource(ttl=600)
+def get_analytics(df_version, start_date, end_date):
+    return MoodAnalytics(get_filtered_data(df_version, start_date, end_date))
+
+@st.cache_data(ttl=600)
+def build_trend_chart(df_version, start_date, end_date, chart_type="line"):
+    return create_mood_chart(get_filtered_data(df_version, start_date, end_date), chart_type=chart_type)
+
+@st.cache_data(ttl=600)
+def build_moving_average_chart(df_version, start_date, end_date):
+    filtered_df = get_filtered_data(df_version, start_date, end_date)
+    ma_chart = create_mood_chart(filtered_df, chart_type="line")
+    
+    # Add moving averages, computed on date-ordered arrays instead of a frame copy
+    dates = filtered_df['date'].to_numpy()
+    order = np.argsort(dates, kind='stable')
+    dates_sorted = dates[order]
+    moods_sorted = filtered_df['mood'].to_numpy(dtype=np.float64)[order]
+    
+    ma_chart.add_scatter(
+        x=dates_sorted,
+        y=running_mean(moods_sorted, 7),
+        mode='lines',
+        name='7-day Average',
+        line=dict(color='orange', width=2)
+    )
+    
+    if moods_sorted.size >= 30:
+        ma_chart.add_scatter(
+            x=dates_sorted,
+            y=running_mean(moods_sorted, 30),
+            mode='lines',
+            name='30-day Average',
+            line=dict(color='red', width=2)
+        )
+    
+    return ma_chart
+
+@st.cache_data(ttl=600)
+def build_distribution_chart(df_version, start_date, end_date):
+    return create_mood_distribution(get_filtered_data(df_version, start_date, end_date))
+
+@st.cache_data(ttl=600)
+def build_heatmap(df_version, start_date, end_date):
+    return create_mood_heatmap(get_filtered_data(df_version, start_date, end_date))
+
+@st.cache_data(ttl=600)
+def build_weekly_chart(df_version, start_date, end_date):
+    weekly_patterns = get_analytics(df_version, start_date, end_date).get_weekly_patterns()
+    return create_weekly_pattern_chart(
+        get_filtered_data(df_version, start_date, end_date),
+        weekday_averages=weekly_patterns['weekday_averages']
+    )
+
+@st.cache_data(ttl=600)
+def build_monthly_chart(df_version, start_date, end_date):
+    return create_monthly_trend_chart(get_filtered_data(df_version, start_date, end_date))
+
 # Load data
 df = data_manager.load_data()
 
@@ -32,13 +106,12 @@ if df.empty:
     st.info("No mood data available yet. Start logging your mood to see analytics!")
     st.stop()
 
-# Initialize analytics
-analytics = MoodAnalytics(df)
+df_version = data_manager.get_version()
 
 # Date range selector
 st.sidebar.header("📅 Date Range")
-min_date = df['date'].min()
-max_date = df['date'].max()
+min_date = df['date'].min().date()
+max_date = df['date'].max().date()
 
 date_range = st.sidebar.date_input(
     "Select date range",
@@ -49,29 +122,39 @@ date_range = st.sidebar.date_input(
 
 if len(date_range) == 2:
     start_date, end_date = date_range
-    filtered_df = data_manager.get_date_range_data(start_date, end_date)
 else:
-    filtered_df = df
+    start_date, end_date = min_date, max_date
+
+filtered_df = get_filtered_data(df_version, start_date, end_date)
+
+if filtered_df.empty:
+    st.warning("No entries in the selected date range.")
+    st.stop()
+
+analytics = get_analytics(df_version, start_date, end_date)
 
 # Overview metrics
 st.header("📈 Overview")
 
+# Overview and Mood Statistics share one memoized summary of the mood column
+summary = analytics.get_summary_statistics()
+
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    avg_mood = filtered_df['mood'].mean()
+    avg_mood = summary['average_mood']
     st.metric("Average Mood", f"{avg_mood:.1f}/5")
 
 with col2:
-    total_entries = len(filtered_df)
+    total_entries = summary['total_entries']
     st.metric("Total Entries", total_entries)
 
 with col3:
-    best_mood = filtered_df['mood'].max()
+    best_mood = summary['best_mood']
     st.metric("Best Mood", f"{best_mood}/5")
 
 with col4:
-    mood_range = filtered_df['mood'].max() - filtered_df['mood'].min()
+    mood_range = summary['best_mood'] - summary['worst_mood']
     st.metric("Mood Range", f"{mood_range}")
 
 # Mood trends
@@ -85,37 +168,13 @@ with tab1:
     with col1:
         if len(filtered_df) >= 2:
             # Main trend chart
-            trend_chart = create_mood_chart(filtered_df, chart_type="line")
+            trend_chart = build_trend_chart(df_version, start_date, end_date, chart_type="line")
             st.plotly_chart(trend_chart, use_container_width=True)
             
             # Moving averages
             if len(filtered_df) >= 7:
                 st.subheader("📊 Moving Averages")
-                ma_chart = create_mood_chart(filtered_df, chart_type="line")
-                
-                # Add moving averages
-                df_with_ma = filtered_df.copy().sort_values('date')
-                df_with_ma['7_day_ma'] = df_with_ma['mood'].rolling(window=7, min_periods=1).mean()
-                if len(filtered_df) >= 30:
-                    df_with_ma['30_day_ma'] = df_with_ma['mood'].rolling(window=30, min_periods=1).mean()
-                
-                ma_chart.add_scatter(
-                    x=df_with_ma['date'],
-                    y=df_with_ma['7_day_ma'],
-                    mode='lines',
-                    name='7-day Average',
-                    line=dict(color='orange', width=2)
-                )
-                
-                if '30_day_ma' in df_with_ma.columns:
-                    ma_chart.add_scatter(
-                        x=df_with_ma['date'],
-                        y=df_with_ma['30_day_ma'],
-                        mode='lines',
-                        name='30-day Average',
-                        line=dict(color='red', width=2)
-                    )
-                
+                ma_chart = build_moving_average_chart(df_version, start_date, end_date)
                 st.plotly_chart(ma_chart, use_container_width=True)
         else:
             st.info("Need at least 2 entries to show trend analysis.")
@@ -151,7 +210,7 @@ with tab2:
     
     with col1:
         # Mood distribution pie chart
-        dist_chart = create_mood_distribution(filtered_df)
+        dist_chart = build_distribution_chart(df_version, start_date, end_date)
         st.plotly_chart(dist_chart, use_container_width=True)
     
     with col2:
@@ -159,11 +218,11 @@ with tab2:
         st.subheader("📊 Mood Statistics")
         
         mood_stats = {
-            "Most Common Mood": filtered_df['mood'].mode().iloc[0],
-            "Median Mood": filtered_df['mood'].median(),
-            "Standard Deviation": filtered_df['mood'].std(),
-            "Best Day": filtered_df.loc[filtered_df['mood'].idxmax(), 'date'],
-            "Worst Day": filtered_df.loc[filtered_df['mood'].idxmin(), 'date']
+            "Most Common Mood": summary['most_common_mood'],
+            "Median Mood": summary['median_mood'],
+            "Standard Deviation": summary['std_deviation'],
+            "Best Day": summary['best_mood_date'],
+            "Worst Day": summary['worst_mood_date']
         }
         
         for stat, value in mood_stats.items():
@@ -174,7 +233,7 @@ with tab2:
 
 with tab3:
     if len(filtered_df) >= 7:
-        heatmap = create_mood_heatmap(filtered_df)
+        heatmap = build_heatmap(df_version, start_date, end_date)
         st.plotly_chart(heatmap, use_container_width=True)
     else:
         st.info("Need at least 7 entries for calendar heatmap view.")
@@ -191,7 +250,7 @@ with tab1:
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            weekly_chart = create_weekly_pattern_chart(filtered_df)
+            weekly_chart = build_weekly_chart(df_version, start_date, end_date)
             st.plotly_chart(weekly_chart, use_container_width=True)
         
         with col2:
@@ -205,8 +264,15 @@ with tab1:
             
             # Show weekday averages
             st.subheader("Average by Day")
-            for day, stats in weekly_patterns['weekday_averages'].iterrows():
-                st.write(f"**{day}:** {stats['mean']:.1f} ({int(stats['count'])} entries)")
+            weekday_averages = weekly_patterns['weekday_averages']
+            st.markdown("\n\n".join(
+                f"**{day}:** {mean:.1f} ({int(count)} entries)"
+                for day, mean, count in zip(
+                    weekday_averages.index,
+                    weekday_averages['mean'].to_numpy(),
+                    weekday_averages['count'].to_numpy()
+                )
+            ))
     else:
         st.info("Need at least 7 entries for weekly pattern analysis.")
 
@@ -217,7 +283,7 @@ with tab2:
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            monthly_chart = create_monthly_trend_chart(filtered_df)
+            monthly_chart = build_monthly_chart(df_version, start_date, end_date)
             st.plotly_chart(monthly_chart, use_container_width=True)
         
         with col2:
@@ -247,18 +313,7 @@ with tab3:
         for factor, correlation in correlations.items():
             label = correlation_labels.get(factor, factor)
             
-            # Interpret correlation strength
-            if abs(correlation) < 0.1:
-                strength = "Very Weak"
-            elif abs(correlation) < 0.3:
-                strength = "Weak"
-            elif abs(correlation) < 0.5:
-                strength = "Moderate"
-            elif abs(correlation) < 0.7:
-                strength = "Strong"
-            else:
-                strength = "Very Strong"
-            
+            strength = correlation_strength(correlation)
             direction = "Positive" if correlation > 0 else "Negative"
             
             st.write(f"**{label}:** {correlation:.3f} ({strength} {direction})")
@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import calendar
 from datetime import datetime, date, timedelta
 from utils.data_manager import DataManager
+from utils.constants import MOOD_EMOJI, MOOD_COLOR, mood_label
 
 st.set_page_config(
     page_title="Calendar View - Mood Tracker",
@@ -10,6 +12,83 @@ st.set_page_config(
     layout="wide"
 )
 
+# Page stylesheet, shared by the calendar grid and the day details
+CALENDAR_CSS = """
+<style>
+table.cal {
+    width: 100%;
+    table-layout: fixed;
+    border-collapse: separate;
+    border: none;
+}
+
+table.cal th, table.cal td {
+    border: none;
+    padding: 0;
+    vertical-align: top;
+}
+
+.calendar-day {
+    border: 1px solid #ddd;
+    border-radius: 8px;
+    padding: 10px;
+    margin: 2px;
+    min-height: 80px;
+    text-align: center;
+    background-color: white;
+    position: relative;
+}
+
+.calendar-day-header {
+    font-weight: bold;
+    text-align: center;
+    padding: 10px;
+    background-color: #f0f0f0;
+    border-radius: 8px;
+    margin: 2px;
+}
+
+.mood-indicator {
+    font-size: 24px;
+    margin: 5px 0;
+}
+
+.day-number {
+    font-weight: bold;
+    font-size: 14px;
+}
+
+.mood-score {
+    font-size: 12px;
+    color: #666;
+}
+
+.no-mood {
+    color: #ccc;
+    font-size: 12px;
+}
+
+.calendar-padding {
+    visibility: hidden;
+}
+
+.detail-emoji {
+    text-align: center;
+    font-size: 48px;
+}
+
+.detail-score {
+    text-align: center;
+    font-size: 24px;
+}
+
+.today {
+    border: 2px solid #4CAF50;
+    background-color: #f0fff0;
+}
+</style>
+"""
+
 st.title("📅 Calendar View")
 st.markdown("View your mood entries in a calendar format")
 
@@ -93,135 +172,123 @@ else:
 
 month_data = data_manager.get_date_range_data(month_start.date(), month_end.date())
 
-# Create mood lookup dictionary
-mood_lookup = {}
-if not month_data.empty:
-    for _, row in month_data.iterrows():
-        mood_lookup[row['date']] = {
-            'mood': row['mood'],
-            'journal': row['journal']
-        }
-
-# Mood emoji mapping
-mood_emojis = {1: "😢", 2: "😕", 3: "😐", 4: "😊", 5: "😄"}
-mood_colors = {1: "#ff4444", 2: "#ff8844", 3: "#ffdd44", 4: "#88dd44", 5: "#44dd44"}
+# Create mood lookup dictionary from the column arrays, keyed by date ordinal
+mood_lookup = {
+    entry_date.toordinal(): {'mood': mood, 'journal': journal}
+    for entry_date, mood, journal in zip(
+        month_data['date'].dt.date.to_numpy(),
+        month_data['mood'].to_numpy(),
+        month_data['journal'].to_numpy()
+    )
+}
 
-# Generate calendar
-cal = calendar.monthcalendar(current_month.year, current_month.month)
+# Calendar cell templates, indexed by whether the day has an entry
+DAY_CELL_TEMPLATES = (
+    '<td><div class="calendar-day {today_class}">'
+    '<div class="day-number">{day}</div>'
+    '<div class="no-mood">No entry</div>'
+    '</div></td>',
+    '<td><div class="calendar-day {today_class}" style="border-color: {color};">'
+    '<div class="day-number">{day}</div>'
+    '<div class="mood-indicator">{emoji}</div>'
+    '<div class="mood-score">{mood}/5</div>'
+    '</div></td>'
+)
+PADDING_CELL = '<td><div class="calendar-day calendar-padding"></div></td>'
+CALENDAR_HEADER_ROW = "<tr>" + "".join(
+    f'<th><div class="calendar-day-header">{day}</div></th>'
+    for day in ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+) + "</tr>"
 
 # Calendar styling
-st.markdown("""
-<style>
-.calendar-day {
-    border: 1px solid #ddd;
-    border-radius: 8px;
-    padding: 10px;
-    margin: 2px;
-    min-height: 80px;
-    text-align: center;
-    background-color: white;
-    position: relative;
-}
+st.markdown(CALENDAR_CSS, unsafe_allow_html=True)
 
-.calendar-day-header {
-    font-weight: bold;
-    text-align: center;
-    padding: 10px;
-    background-color: #f0f0f0;
-    border-radius: 8px;
-    margin: 2px;
-}
+# Display calendar as a single HTML table
+def day_cell_html(day, first_ordinal, today_ordinal, present, month_moods):
+    """Render one calendar cell; day 0 pads the weeks outside this month"""
+    if day == 0:
+        return PADDING_CELL
+    
+    today_class = "today" if first_ordinal + day == today_ordinal else ""
+    
+    # Check the presence bitmap for a mood entry on this day
+    offset = day - 1
+    if not (present >> offset) & 1:
+        return DAY_CELL_TEMPLATES[0].format(day=day, today_class=today_class)
+    
+    mood = int(month_moods[offset])
+    return DAY_CELL_TEMPLATES[1].format(
+        day=day,
+        today_class=today_class,
+        color=MOOD_COLOR[mood],
+        emoji=MOOD_EMOJI[mood],
+        mood=mood
+    )
 
-.mood-indicator {
-    font-size: 24px;
-    margin: 5px 0;
-}
+def calendar_table_html(year, month, today_ordinal, present=0, month_moods=None):
+    """Render a month as one HTML table of day cells"""
+    first_ordinal = date(year, month, 1).toordinal() - 1
+    rows = [CALENDAR_HEADER_ROW]
+    for week in calendar.monthcalendar(year, month):
+        rows.append("<tr>" + "".join(
+            day_cell_html(day, first_ordinal, today_ordinal, present, month_moods) for day in week
+        ) + "</tr>")
+    return '<table class="cal">' + "".join(rows) + '</table>'
 
-.day-number {
-    font-weight: bold;
-    font-size: 14px;
-}
+@st.cache_data
+def empty_month_html(year, month, today_ordinal):
+    """A month without entries renders the same table on every rerun"""
+    return calendar_table_html(year, month, today_ordinal)
 
-.no-mood {
-    color: #ccc;
-    font-size: 12px;
-}
+today_ordinal = date.today().toordinal()
 
-.today {
-    border: 2px solid #4CAF50;
-    background-color: #f0fff0;
-}
-</style>
-""", unsafe_allow_html=True)
-
-# Display calendar header
-header_cols = st.columns(7)
-weekdays = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-for i, day in enumerate(weekdays):
-    with header_cols[i]:
-        st.markdown(f'<div class="calendar-day-header">{day}</div>', unsafe_allow_html=True)
-
-# Display calendar days
-for week in cal:
-    week_cols = st.columns(7)
+if month_data.empty:
+    calendar_html = empty_month_html(current_month.year, current_month.month, today_ordinal)
+else:
+    # Bit d-1 of `present` marks an entry on day d; ratings share the same offsets
+    month_start_ordinal = month_start.toordinal()
+    present = 0
+    month_moods = np.zeros(31, dtype=np.int8)
+    for day_ordinal, mood_data in mood_lookup.items():
+        offset = day_ordinal - month_start_ordinal
+        present |= 1 << offset
+        month_moods[offset] = mood_data['mood']
     
-    for i, day in enumerate(week):
-        with week_cols[i]:
-            if day == 0:
-                # Empty day
-                st.markdown('<div class="calendar-day" style="visibility: hidden;"></div>', 
-                           unsafe_allow_html=True)
-            else:
-                day_date = date(current_month.year, current_month.month, day)
-                is_today = day_date == date.today()
-                
-                # Check if there's a mood entry for this day
-                mood_data = mood_lookup.get(day_date)
-                
-                # Create day content
-                today_class = "today" if is_today else ""
-                
-                if mood_data:
-                    mood_emoji = mood_emojis.get(mood_data['mood'], '😐')
-                    mood_color = mood_colors.get(mood_data['mood'], '#ddd')
-                    
-                    day_content = f"""
-                    <div class="calendar-day {today_class}" style="border-color: {mood_color};">
-                        <div class="day-number">{day}</div>
-                        <div class="mood-indicator">{mood_emoji}</div>
-                        <div style="font-size: 12px; color: #666;">{mood_data['mood']}/5</div>
-                    </div>
-                    """
-                else:
-                    day_content = f"""
-                    <div class="calendar-day {today_class}">
-                        <div class="day-number">{day}</div>
-                        <div class="no-mood">No entry</div>
-                    </div>
-                    """
-                
-                # Make day clickable using button
-                if st.button(f"📅 {day}", key=f"day_{day}", help=f"View details for {day_date}"):
-                    st.session_state.selected_day = day_date
-                
-                st.markdown(day_content, unsafe_allow_html=True)
+    calendar_html = calendar_table_html(
+        current_month.year, current_month.month, today_ordinal, present, month_moods
+    )
+
+st.markdown(calendar_html, unsafe_allow_html=True)
+
+# Day picker (a single widget instead of one button per calendar cell)
+days_in_month = calendar.monthrange(current_month.year, current_month.month)[1]
+picked_day = st.selectbox(
+    "📅 View details for day",
+    options=range(1, days_in_month + 1),
+    index=None,
+    placeholder="Select a day",
+    format_func=lambda x: f"{current_month.strftime('%B')} {x}",
+    key=f"day_picker_{current_month.year}_{current_month.month}"
+)
+
+if picked_day is not None:
+    st.session_state.selected_day = date(current_month.year, current_month.month, picked_day)
 
 # Display selected day details
 if 'selected_day' in st.session_state:
     selected_date = st.session_state.selected_day
     st.header(f"📅 Details for {selected_date.strftime('%B %d, %Y')}")
     
-    mood_data = mood_lookup.get(selected_date)
+    mood_data = mood_lookup.get(selected_date.toordinal())
     
     if mood_data:
         col1, col2 = st.columns([1, 3])
         
         with col1:
-            mood_emoji = mood_emojis.get(mood_data['mood'], '😐')
-            st.markdown(f"<div style='text-align: center; font-size: 48px;'>{mood_emoji}</div>", 
-                       unsafe_allow_html=True)
-            st.markdown(f"<div style='text-align: center; font-size: 24px;'>{mood_data['mood']}/5</div>", 
-                       unsafe_allow_html=True)
+            mood_emoji = MOOD_EMOJI[mood_data['mood']]
+            st.markdown(f"<div class='detail-emoji'>{mood_emoji}</div>"
+                        f"<div class='detail-score'>{mood_data['mood']}/5</div>",
+                        unsafe_allow_html=True)
         
         with col2:
             st.subheader("Journal Entry")
@@ -246,7 +313,7 @@ if 'selected_day' in st.session_state:
 # Edit mode
 if st.session_state.get('edit_mode', False):
     edit_date = st.session_state.edit_date
-    existing_data = mood_lookup.get(edit_date)
+    existing_data = mood_lookup.get(edit_date.toordinal())
     
     st.header(f"✏️ Edit Entry for {edit_date.strftime('%B %d, %Y')}")
     
@@ -255,7 +322,7 @@ if st.session_state.get('edit_mode', False):
             "Update mood rating",
             options=[1, 2, 3, 4, 5],
             value=existing_data['mood'] if existing_data else 3,
-            format_func=lambda x: f"{x} {'😢' if x==1 else '😕' if x==2 else '😐' if x==3 else '😊' if x==4 else '😄'}"
+            format_func=mood_label
         )
         
         new_journal = st.text_area(
@@ -294,7 +361,7 @@ if st.session_state.get('add_mode', False):
             "Mood rating",
             options=[1, 2, 3, 4, 5],
             value=3,
-            format_func=lambda x: f"{x} {'😢' if x==1 else '😕' if x==2 else '😐' if x==3 else '😊' if x==4 else '😄'}"
+            format_func=mood_label
         )
         
         new_journal = st.text_area(
@@ -340,18 +407,17 @@ if not month_data.empty:
         st.metric("Best Day", best_day.strftime('%m/%d'))
     
     with col4:
-        entries_with_journal = len(month_data[month_data['journal'].str.len() > 0])
+        entries_with_journal = int(month_data['journal_length'].gt(0).sum())
         st.metric("Days with Journal", entries_with_journal)
     
     # Mood distribution for the month
     st.subheader("📊 Mood Distribution This Month")
-    mood_counts = month_data['mood'].value_counts().sort_index()
+    mood_counts = np.bincount(month_data['mood'].to_numpy(dtype=np.int64), minlength=6)[1:6]
     
     mood_cols = st.columns(5)
-    for i, mood in enumerate([1, 2, 3, 4, 5]):
-        with mood_cols[i]:
-            count = mood_counts.get(mood, 0)
-            emoji = mood_emojis.get(mood, '😐')
-            st.metric(f"{emoji} {mood}", count)
+    for mood, count in enumerate(mood_counts, start=1):
+        with mood_cols[mood - 1]:
+            emoji = MOOD_EMOJI[mood]
+            st.metric(f"{emoji} {mood}", int(count))
 else:
     st.info(f"No mood entries for {current_month.strftime('%B %Y')}. Start logging your mood to see calendar data!")
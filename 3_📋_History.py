@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import re
+from collections import Counter
 from datetime import datetime, date, timedelta
 from utils.data_manager import DataManager
+from utils.constants import MOOD_EMOJI, MOOD_COLOR, mood_label
 
 st.set_page_config(
     page_title="History - Mood Tracker",
@@ -12,6 +16,14 @@ st.set_page_config(
 st.title("📋 Mood History")
 st.markdown("Browse and search through your mood entries")
 
+# Journal word frequency: words of four or more letters, minus common stop words
+WORD_RE = re.compile(r'\b[a-z]{4,}\b')
+# Shorter stop words are already excluded by the regex, so only longer ones are listed
+STOP_WORDS = frozenset({
+    'with', 'were', 'been', 'have', 'will', 'would', 'could', 'should', 'might',
+    'this', 'that', 'these', 'those', 'they', 'them', 'your', 'their'
+})
+
 # Initialize data manager
 @st.cache_resource
 def get_data_manager():
@@ -19,6 +31,102 @@ def get_data_manager():
 
 data_manager = get_data_manager()
 
+def get_search_pattern(search_query):
+    """Literal, case-insensitive pattern for the query, compiled once per distinct query"""
+    cached = st.session_state.get('search_pattern')
+    if cached is None or cached[0] != search_query:
+        cached = (search_query, re.compile(re.escape(search_query), re.IGNORECASE))
+        st.session_state.search_pattern = cached
+    return cached[1]
+
+# Cached filter pipeline and summary. They are keyed on the data file version
+# and the sidebar inputs, so pagination and edit clicks reuse earlier results.
+@st.cache_data(ttl=600)
+def filter_entries(df_version, start_date, end_date, moods, search_query):
+    df = data_manager.load_data()
+    
+    # All filters build one boolean mask over the full frame, which is indexed once
+    # Mood filter: ratings are 1-5, so a boolean table indexed by rating replaces isin
+    selected_moods = np.zeros(6, dtype=bool)
+    selected_moods[list(moods)] = True
+    mask = selected_moods[df['mood'].to_numpy()]
+    
+    # Date range filter: data is sorted by date, so everything outside one slice drops out
+    if start_date is not None:
+        mask[:df['date'].searchsorted(pd.Timestamp(start_date), side='left')] = False
+        mask[df['date'].searchsorted(pd.Timestamp(end_date), side='right'):] = False
+    
+    # Search filter: the string scan is the expensive test, so only surviving rows get it
+    if search_query:
+        candidates = np.flatnonzero(mask)
+        mask[candidates] = df['journal'].iloc[candidates].str.contains(
+            get_search_pattern(search_query), na=False
+        ).to_numpy()
+    
+    return df[mask]
+
+@st.cache_data(ttl=600)
+def get_page(df_version, start_date, end_date, moods, search_query, sort_by, start_idx, end_idx):
+    """Rows start_idx:end_idx in sort order, without sorting the whole filtered set"""
+    sort_column, ascending = sort_options[sort_by]
+    filtered_df = filter_entries(df_version, start_date, end_date, moods, search_query)
+    n = len(filtered_df)
+    
+    values = filtered_df[sort_column].to_numpy()
+    if sort_column == 'date':
+        values = values.astype('datetime64[D]')
+    values = values.astype(np.int64)
+    if not ascending:
+        values = -values
+    # Break ties by position so every page agrees on one total order
+    keys = values * n + np.arange(n)
+    
+    if end_idx < n // 4:
+        # Only the first end_idx rows matter; partition them out and sort just those
+        top = np.argpartition(keys, end_idx)[:end_idx]
+        order = top[np.argsort(keys[top])]
+    else:
+        order = np.argsort(keys)
+    
+    return filtered_df.iloc[order[start_idx:end_idx]]
+
+@st.cache_data(ttl=600)
+def compute_summary(df_version, start_date, end_date, moods, search_query):
+    """Summary statistics and word frequencies; these do not depend on sort order"""
+    filtered_df = filter_entries(df_version, start_date, end_date, moods, search_query)
+    
+    # One numpy view per column instead of a separate pandas reduction per statistic
+    moods_arr = filtered_df['mood'].to_numpy()
+    dates_arr = filtered_df['date'].dt.date.to_numpy()
+    best_idx = moods_arr.argmax()
+    worst_idx = moods_arr.argmin()
+    has_journal = filtered_df['journal_length'].to_numpy() > 0
+    entries_with_journal = int(has_journal.sum())
+    
+    summary = {
+        'avg_mood': moods_arr.mean(),
+        'best_mood': moods_arr[best_idx],
+        'best_date': dates_arr[best_idx],
+        'worst_mood': moods_arr[worst_idx],
+        'worst_date': dates_arr[worst_idx],
+        'entries_with_journal': entries_with_journal,
+        'journal_percentage': has_journal.mean() * 100,
+        'mood_counts': filtered_df['mood'].value_counts().sort_index(),
+        'word_freq': []
+    }
+    
+    # Word cloud or common words (if journal entries exist)
+    journal_entries = filtered_df[has_journal]
+    
+    if not journal_entries.empty:
+        # Tokenize each entry separately and stream the words into the counter,
+        # so no joined string or exploded token Series is ever built
+        token_lists = journal_entries['journal'].str.lower().str.findall(WORD_RE)
+        word_counts = Counter(word for words in token_lists for word in words if word not in STOP_WORDS)
+        summary['word_freq'] = word_counts.most_common(10)
+    
+    return summary
+
 # Load data
 df = data_manager.load_data()
 
@@ -30,8 +138,8 @@ if df.empty:
 st.sidebar.header("🔍 Filters")
 
 # Date range filter
-min_date = df['date'].min()
-max_date = df['date'].max()
+min_date = df['date'].min().date()
+max_date = df['date'].max().date()
 
 date_range = st.sidebar.date_input(
     "Date Range",
@@ -45,7 +153,7 @@ mood_filter = st.sidebar.multiselect(
     "Mood Rating",
     options=[1, 2, 3, 4, 5],
     default=[1, 2, 3, 4, 5],
-    format_func=lambda x: f"{x} {'😢' if x==1 else '😕' if x==2 else '😐' if x==3 else '😊' if x==4 else '😄'}"
+    format_func=mood_label
 )
 
 # Search functionality
@@ -68,30 +176,14 @@ sort_by = st.sidebar.selectbox(
     index=0
 )
 
-# Apply filters
-filtered_df = df.copy()
-
-# Date range filter
+# Apply filters and sorting
 if len(date_range) == 2:
     start_date, end_date = date_range
-    filtered_df = filtered_df[
-        (filtered_df['date'] >= start_date) & 
-        (filtered_df['date'] <= end_date)
-    ]
+else:
+    start_date, end_date = None, None
 
-# Mood filter
-filtered_df = filtered_df[filtered_df['mood'].isin(mood_filter)]
-
-# Search filter
-if search_query:
-    search_mask = filtered_df['journal'].str.contains(
-        search_query, case=False, na=False
-    )
-    filtered_df = filtered_df[search_mask]
-
-# Apply sorting
-sort_column, ascending = sort_options[sort_by]
-filtered_df = filtered_df.sort_values(sort_column, ascending=ascending)
+filter_key = (data_manager.get_version(), start_date, end_date, tuple(mood_filter), search_query)
+filtered_df = filter_entries(*filter_key)
 
 # Display results
 st.header(f"📊 Results ({len(filtered_df)} entries)")
@@ -143,21 +235,35 @@ with col5:
 start_idx = (st.session_state.current_page - 1) * entries_per_page
 end_idx = min(start_idx + entries_per_page, len(filtered_df))
 
-page_df = filtered_df.iloc[start_idx:end_idx]
+page_df = get_page(*filter_key, sort_by, start_idx, end_idx)
+
+# Search highlighting reuses the pattern the filter matched with
+if search_query:
+    highlight_pattern = get_search_pattern(search_query)
+    # Backslashes are escaped so the query is inserted literally by re.sub
+    highlight_repl = f"**{search_query.upper()}**".replace('\\', r'\\')
+else:
+    highlight_pattern = None
 
-# Mood emoji mapping
-mood_emojis = {1: "😢", 2: "😕", 3: "😐", 4: "😊", 5: "😄"}
-mood_colors = {1: "#ff4444", 2: "#ff8844", 3: "#ffdd44", 4: "#88dd44", 5: "#44dd44"}
+# Format the page's dates in one vectorized pass rather than per entry
+page_dates = page_df['date']
 
 # Display entries
-for idx, (_, entry) in enumerate(page_df.iterrows()):
+page_entries = zip(
+    page_dates.dt.date.to_numpy(),
+    page_dates.dt.strftime('%A, %B %d, %Y').to_numpy(),
+    page_dates.dt.day_name().to_numpy(),
+    page_df['mood'].to_numpy(),
+    page_df['journal'].fillna('').to_numpy()
+)
+
+for idx, (entry_day, entry_date, day_name, mood, journal) in enumerate(page_entries):
     # Create expandable entry
-    mood_emoji = mood_emojis.get(entry['mood'], '😐')
-    mood_color = mood_colors.get(entry['mood'], '#ddd')
+    mood_emoji = MOOD_EMOJI[mood]
+    mood_color = MOOD_COLOR[mood]
     
     # Entry header
-    entry_date = entry['date'].strftime('%A, %B %d, %Y')
-    header = f"{mood_emoji} {entry_date} - Mood: {entry['mood']}/5"
+    header = f"{mood_emoji} {entry_date} - Mood: {mood}/5"
     
     with st.expander(header, expanded=False):
         col1, col2 = st.columns([1, 4])
@@ -168,41 +274,39 @@ for idx, (_, entry) in enumerate(page_df.iterrows()):
             <div style='text-align: center; padding: 20px; border-radius: 10px; 
                         background-color: {mood_color}20; border: 2px solid {mood_color};'>
                 <div style='font-size: 48px;'>{mood_emoji}</div>
-                <div style='font-size: 24px; font-weight: bold;'>{entry['mood']}/5</div>
+                <div style='font-size: 24px; font-weight: bold;'>{mood}/5</div>
             </div>
             """, unsafe_allow_html=True)
             
             # Entry metadata
             st.markdown("**Date:** " + entry_date)
-            st.markdown(f"**Day:** {entry['date'].strftime('%A')}")
+            st.markdown(f"**Day:** {day_name}")
             
             # Quick actions
             if st.button(f"✏️ Edit", key=f"edit_{idx}"):
-                st.session_state.edit_entry = entry.to_dict()
-                st.session_state.edit_entry['original_date'] = entry['date']
+                st.session_state.edit_entry = {
+                    'date': entry_day,
+                    'mood': int(mood),
+                    'journal': journal,
+                    'original_date': entry_day
+                }
                 st.rerun()
         
         with col2:
             st.subheader("📝 Journal Entry")
-            if entry['journal']:
+            if journal:
                 # Highlight search terms if search is active
-                journal_text = entry['journal']
-                if search_query:
-                    # Simple highlighting (case-insensitive)
-                    import re
-                    pattern = re.compile(re.escape(search_query), re.IGNORECASE)
-                    journal_text = pattern.sub(
-                        f"**{search_query.upper()}**", 
-                        journal_text
-                    )
+                journal_text = journal
+                if highlight_pattern is not None:
+                    journal_text = highlight_pattern.sub(highlight_repl, journal_text)
                 st.markdown(journal_text)
             else:
                 st.markdown("*No journal entry for this day*")
             
             # Word count and stats
-            if entry['journal']:
-                word_count = len(entry['journal'].split())
-                char_count = len(entry['journal'])
+            if journal:
+                word_count = len(journal.split())
+                char_count = len(journal)
                 st.caption(f"📊 {word_count} words, {char_count} characters")
 
 # Edit entry modal
@@ -216,7 +320,7 @@ if 'edit_entry' in st.session_state:
             "Update mood rating",
             options=[1, 2, 3, 4, 5],
             value=edit_data['mood'],
-            format_func=lambda x: f"{x} {'😢' if x==1 else '😕' if x==2 else '😐' if x==3 else '😊' if x==4 else '😄'}"
+            format_func=mood_label
         )
         
         updated_journal = st.text_area(
@@ -249,82 +353,59 @@ if 'edit_entry' in st.session_state:
 # Summary statistics for filtered data
 st.header("📊 Summary Statistics")
 
+summary = compute_summary(*filter_key)
+
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    avg_mood = filtered_df['mood'].mean()
+    avg_mood = summary['avg_mood']
     st.metric("Average Mood", f"{avg_mood:.1f}/5")
 
 with col2:
-    best_mood = filtered_df['mood'].max()
-    best_date = filtered_df.loc[filtered_df['mood'].idxmax(), 'date']
+    best_mood = summary['best_mood']
+    best_date = summary['best_date']
     st.metric("Best Mood", f"{best_mood}/5", delta=f"on {best_date.strftime('%m/%d')}")
 
 with col3:
-    worst_mood = filtered_df['mood'].min()
-    worst_date = filtered_df.loc[filtered_df['mood'].idxmin(), 'date']
+    worst_mood = summary['worst_mood']
+    worst_date = summary['worst_date']
     st.metric("Worst Mood", f"{worst_mood}/5", delta=f"on {worst_date.strftime('%m/%d')}")
 
 with col4:
-    entries_with_journal = len(filtered_df[filtered_df['journal'].str.len() > 0])
-    journal_percentage = (entries_with_journal / len(filtered_df)) * 100
+    entries_with_journal = summary['entries_with_journal']
+    journal_percentage = summary['journal_percentage']
     st.metric("With Journal", f"{entries_with_journal}", delta=f"{journal_percentage:.0f}%")
 
 # Mood distribution chart
 st.subheader("📊 Mood Distribution")
 
-mood_counts = filtered_df['mood'].value_counts().sort_index()
+mood_counts = summary['mood_counts']
 mood_cols = st.columns(5)
 
 for i, mood in enumerate([1, 2, 3, 4, 5]):
     with mood_cols[i]:
         count = mood_counts.get(mood, 0)
         percentage = (count / len(filtered_df)) * 100 if len(filtered_df) > 0 else 0
-        emoji = mood_emojis.get(mood, '😐')
+        emoji = MOOD_EMOJI[mood]
         st.metric(f"{emoji} {mood}", f"{count}", delta=f"{percentage:.1f}%")
 
-# Word cloud or common words (if journal entries exist)
-journal_entries = filtered_df[filtered_df['journal'].str.len() > 0]
+# Common words (if journal entries exist)
+word_freq = summary['word_freq']
 
-if not journal_entries.empty:
+if word_freq:
     st.subheader("📝 Journal Insights")
+    st.write("**Most Common Words in Journal Entries:**")
     
-    # Combine all journal entries
-    all_journals = ' '.join(journal_entries['journal'].tolist())
-    
-    # Simple word frequency analysis
-    import re
-    from collections import Counter
+    word_cols = st.columns(5)
+    for i, (word, count) in enumerate(word_freq[:5]):
+        with word_cols[i]:
+            st.metric(word.capitalize(), count)
     
-    # Extract words (simple approach)
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', all_journals.lower())
-    
-    # Filter out common stop words
-    stop_words = {
-        'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
-        'was', 'were', 'is', 'are', 'been', 'be', 'have', 'has', 'had', 'will', 'would',
-        'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those',
-        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
-        'my', 'your', 'his', 'her', 'its', 'our', 'their', 'a', 'an'
-    }
-    
-    filtered_words = [word for word in words if word not in stop_words and len(word) > 3]
-    
-    if filtered_words:
-        word_freq = Counter(filtered_words).most_common(10)
-        
-        st.write("**Most Common Words in Journal Entries:**")
-        
-        word_cols = st.columns(5)
-        for i, (word, count) in enumerate(word_freq[:5]):
-            with word_cols[i]:
+    if len(word_freq) > 5:
+        word_cols2 = st.columns(5)
+        for i, (word, count) in enumerate(word_freq[5:10]):
+            with word_cols2[i]:
                 st.metric(word.capitalize(), count)
-        
-        if len(word_freq) > 5:
-            word_cols2 = st.columns(5)
-            for i, (word, count) in enumerate(word_freq[5:10]):
-                with word_cols2[i]:
-                    st.metric(word.capitalize(), count)
 
 # Bulk actions
 st.header("⚙️ Bulk Actions")
@@ -333,7 +414,10 @@ col1, col2 = st.columns(2)
 
 with col1:
     if st.button("📤 Export Filtered Data"):
-        csv_data = filtered_df.to_csv(index=False)
+        sort_column, ascending = sort_options[sort_by]
+        csv_data = filtered_df.sort_values(sort_column, ascending=ascending, kind='stable').to_csv(
+            index=False, columns=data_manager.columns
+        )
         st.download_button(
             label="💾 Download CSV",
             data=csv_data,
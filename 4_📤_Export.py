@@ -6,6 +6,12 @@ import base64
 from io import StringIO, BytesIO
 from utils.data_manager import DataManager
 from utils.analytics import MoodAnalytics
+from utils.constants import MOOD_EMOJI
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder produces the same JSON
+    orjson = None
 
 st.set_page_config(
     page_title="Export - Mood Tracker",
@@ -23,8 +29,172 @@ def get_data_manager():
 
 data_manager = get_data_manager()
 
+def dumps_json(data, indent=False):
+    """Serialize data to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+# Reports and summaries are cached on the data file version, their options and
+# the time Generate was clicked, so reruns reuse a report and its timestamp
+@st.cache_data(ttl=600)
+def build_report(df_version, start_date, end_date, include_insights, generated_on):
+    """Analytics report for the date range as UTF-8 JSON bytes"""
+    filtered_df = data_manager.get_date_range_data(start_date, end_date)
+    journals = filtered_df['journal'].fillna('')
+    journal_word_counts = journals.str.count(r'\S+').to_numpy()
+    analytics = MoodAnalytics(filtered_df)
+    
+    # Generate report
+    report_data = {
+        "report_info": {
+            "generated_on": generated_on.isoformat(),
+            "date_range": {
+                "start": start_date.isoformat(),
+                "end": end_date.isoformat()
+            },
+            "total_entries": len(filtered_df)
+        },
+        "basic_statistics": {
+            "average_mood": float(filtered_df['mood'].mean()),
+            "median_mood": float(filtered_df['mood'].median()),
+            "std_deviation": float(filtered_df['mood'].std()),
+            "mood_range": int(filtered_df['mood'].max() - filtered_df['mood'].min()),
+            "best_mood_date": filtered_df.loc[filtered_df['mood'].idxmax(), 'date'].strftime('%Y-%m-%d'),
+            "worst_mood_date": filtered_df.loc[filtered_df['mood'].idxmin(), 'date'].strftime('%Y-%m-%d'),
+            "mood_distribution": filtered_df['mood'].value_counts().to_dict()
+        }
+    }
+    
+    if include_insights:
+        # Add analytics insights
+        mood_trends = analytics.get_mood_trends()
+        weekly_patterns = analytics.get_weekly_patterns()
+        volatility = analytics.get_mood_volatility()
+        streak_analysis = analytics.get_streak_analysis()
+        
+        report_data["insights"] = {
+            "trend_analysis": {
+                "direction": mood_trends.get('trend_direction', 'unknown'),
+                "recent_average": float(mood_trends.get('recent_average', 0)),
+                "previous_average": float(mood_trends.get('previous_average', 0))
+            },
+            "volatility_analysis": {
+                "stability_score": float(volatility.get('stability_score', 0)),
+                "volatility_category": volatility.get('volatility_category', 'unknown'),
+                "average_daily_change": float(volatility.get('average_daily_change', 0))
+            },
+            "streak_analysis": {
+                "longest_streak": streak_analysis.get('longest_streak', 0),
+                "average_streak": float(streak_analysis.get('average_streak', 0)),
+                "consistency_score": float(streak_analysis.get('consistency_score', 0))
+            }
+        }
+        
+        if weekly_patterns.get('weekday_averages') is not None:
+            weekday_dict = {}
+            for day, stats in weekly_patterns['weekday_averages'].iterrows():
+                weekday_dict[day] = {
+                    "average_mood": float(stats['mean']),
+                    "entry_count": int(stats['count'])
+                }
+            report_data["insights"]["weekly_patterns"] = weekday_dict
+    
+    # Add raw data, built column-wise rather than one dict per iterrows() row
+    entries_df = pd.DataFrame({
+        "date": filtered_df['date'].dt.strftime('%Y-%m-%d'),
+        "mood": filtered_df['mood'].astype(int),
+        "journal": journals,
+        "journal_word_count": journal_word_counts
+    })
+    report_data["entries"] = entries_df.to_dict(orient='records')
+    
+    # Convert to JSON
+    return dumps_json(report_data, indent=True)
+
+@st.cache_data(ttl=600)
+def build_text_summary(df_version, start_date, end_date, include_stats, include_entries, include_journal_excerpts, generated_on):
+    """Human-readable summary of the date range"""
+    filtered_df = data_manager.get_date_range_data(start_date, end_date)
+    journals = filtered_df['journal'].fillna('')
+    
+    # Generate text summary
+    summary_lines = []
+    
+    # Header
+    summary_lines.append("MOOD TRACKING SUMMARY")
+    summary_lines.append("=" * 50)
+    summary_lines.append(f"Generated on: {generated_on.strftime('%B %d, %Y at %I:%M %p')}")
+    summary_lines.append(f"Period: {start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}")
+    summary_lines.append(f"Total entries: {len(filtered_df)}")
+    summary_lines.append("")
+    
+    if include_stats:
+        # Statistics section
+        summary_lines.append("STATISTICS")
+        summary_lines.append("-" * 20)
+        summary_lines.append(f"Average mood: {filtered_df['mood'].mean():.1f}/5")
+        summary_lines.append(f"Highest mood: {filtered_df['mood'].max()}/5")
+        summary_lines.append(f"Lowest mood: {filtered_df['mood'].min()}/5")
+        summary_lines.append(f"Most stable period: {filtered_df['mood'].std():.2f} standard deviation")
+        summary_lines.append("")
+        
+        # Mood distribution
+        summary_lines.append("MOOD DISTRIBUTION")
+        summary_lines.append("-" * 20)
+        mood_counts = filtered_df['mood'].value_counts().sort_index()
+        
+        for mood, count in mood_counts.items():
+            percentage = (count / len(filtered_df)) * 100
+            emoji = MOOD_EMOJI[mood]
+            summary_lines.append(f"{emoji} {mood}/5: {count} entries ({percentage:.1f}%)")
+        summary_lines.append("")
+    
+    if include_entries:
+        # All entries
+        summary_lines.append("ALL ENTRIES")
+        summary_lines.append("-" * 20)
+        
+        # load_data() already sorts by date, so entries are walked in place
+        entry_dates = filtered_df['date'].dt.strftime('%B %d, %Y').to_numpy()
+        
+        for entry_date, mood, journal in zip(entry_dates, filtered_df['mood'].to_numpy(), journals.to_numpy()):
+            summary_lines.append(f"{entry_date} - {MOOD_EMOJI[mood]} {mood}/5")
+            
+            if journal and include_journal_excerpts:
+                # Truncate long journal entries
+                journal_text = journal[:200] + "..." if len(journal) > 200 else journal
+                summary_lines.append(f"  Journal: {journal_text}")
+            summary_lines.append("")
+    else:
+        # Just highlights
+        best_day = filtered_df.loc[filtered_df['mood'].idxmax()]
+        worst_day = filtered_df.loc[filtered_df['mood'].idxmin()]
+        
+        summary_lines.append("HIGHLIGHTS")
+        summary_lines.append("-" * 20)
+        summary_lines.append(f"Best day: {best_day['date'].strftime('%B %d, %Y')} ({best_day['mood']}/5)")
+        best_journal = journals[best_day.name]
+        if best_journal and include_journal_excerpts:
+            journal_excerpt = best_journal[:150] + "..." if len(best_journal) > 150 else best_journal
+            summary_lines.append(f"  '{journal_excerpt}'")
+        
+        summary_lines.append(f"Worst day: {worst_day['date'].strftime('%B %d, %Y')} ({worst_day['mood']}/5)")
+        worst_journal = journals[worst_day.name]
+        if worst_journal and include_journal_excerpts:
+            journal_excerpt = worst_journal[:150] + "..." if len(worst_journal) > 150 else worst_journal
+            summary_lines.append(f"  '{journal_excerpt}'")
+        summary_lines.append("")
+    
+    # Join all lines
+    return '\n'.join(summary_lines)
+
 # Load data
 df = data_manager.load_data()
+df_version = data_manager.get_version()
 
 if df.empty:
     st.info("No mood data to export. Start logging your mood first!")
@@ -36,21 +206,23 @@ st.header("📊 Export Options")
 # Date range selector
 st.subheader("📅 Select Date Range")
 col1, col2 = st.columns(2)
+min_date = df['date'].min().date()
+max_date = df['date'].max().date()
 
 with col1:
     start_date = st.date_input(
         "Start Date",
-        value=df['date'].min(),
-        min_value=df['date'].min(),
-        max_value=df['date'].max()
+        value=min_date,
+        min_value=min_date,
+        max_value=max_date
     )
 
 with col2:
     end_date = st.date_input(
         "End Date",
-        value=df['date'].max(),
-        min_value=df['date'].min(),
-        max_value=df['date'].max()
+        value=max_date,
+        min_value=min_date,
+        max_value=max_date
     )
 
 # Filter data by date range
@@ -60,13 +232,21 @@ if filtered_df.empty:
     st.warning("No data available for the selected date range.")
     st.stop()
 
+# Journal presence and word counts for the export statistics; counting \S+ runs
+# avoids building a token list per entry just to take its length
+journals = filtered_df['journal'].fillna('')
+has_journal = filtered_df['journal_length'].to_numpy() > 0
+journal_word_counts = journals.str.count(r'\S+').to_numpy()
+
 # Display preview
 st.subheader("📋 Data Preview")
 st.write(f"**Selected Period:** {start_date} to {end_date}")
 st.write(f"**Total Entries:** {len(filtered_df)}")
 
 # Show sample of data
-st.dataframe(filtered_df.head(10), use_container_width=True)
+# Only the stored columns, not the calendar fields DataManager derives on load
+preview_df = filtered_df[data_manager.columns].head(10)
+st.dataframe(preview_df.assign(date=preview_df['date'].dt.date), use_container_width=True)
 
 if len(filtered_df) > 10:
     st.info(f"Showing first 10 entries. {len(filtered_df) - 10} more entries will be included in the export.")
@@ -94,14 +274,18 @@ with tab1:
     )
     
     # Generate CSV
-    export_df = filtered_df.copy()
-    export_df['date'] = export_df['date'].dt.strftime(date_format)
+    # assign() returns a new frame, so the filtered data needs no defensive copy
+    export_df = filtered_df[data_manager.columns].assign(date=filtered_df['date'].dt.strftime(date_format))
     
-    csv_data = export_df.to_csv(index=False, header=include_headers)
+    # Write straight to bytes so the download doesn't re-encode a full str copy
+    csv_buffer = BytesIO()
+    export_df.to_csv(csv_buffer, index=False, header=include_headers)
+    csv_data = csv_buffer.getvalue()
     
     # Show preview
     st.write("**CSV Preview:**")
-    st.code(csv_data[:500] + "..." if len(csv_data) > 500 else csv_data)
+    csv_preview = csv_data[:500].decode('utf-8', errors='replace')
+    st.code(csv_preview + "..." if len(csv_data) > 500 else csv_preview)
     
     # Download button
     st.download_button(
@@ -124,19 +308,21 @@ with tab2:
     )
     
     # Convert to JSON
-    export_df_json = filtered_df.copy()
-    export_df_json['date'] = export_df_json['date'].astype(str)
+    export_df_json = filtered_df[data_manager.columns].assign(date=filtered_df['date'].dt.strftime('%Y-%m-%d'))
     
+    json_buffer = BytesIO()
     if json_format == "Records":
-        json_data = export_df_json.to_json(orient='records', indent=2)
+        export_df_json.to_json(json_buffer, orient='records', indent=2)
     elif json_format == "Table":
-        json_data = export_df_json.to_json(orient='table', indent=2)
+        export_df_json.to_json(json_buffer, orient='table', indent=2)
     else:  # Values
-        json_data = export_df_json.to_json(orient='values', indent=2)
+        export_df_json.to_json(json_buffer, orient='values', indent=2)
+    json_data = json_buffer.getvalue()
     
     # Show preview
     st.write("**JSON Preview:**")
-    preview_data = json_data[:1000] + "..." if len(json_data) > 1000 else json_data
+    json_preview = json_data[:1000].decode('utf-8', errors='replace')
+    preview_data = json_preview + "..." if len(json_data) > 1000 else json_preview
     st.code(preview_data, language="json")
     
     # Download button
@@ -152,97 +338,33 @@ with tab3:
     st.subheader("📈 Analytics Report")
     st.write("Generate a comprehensive analytics report with insights and statistics.")
     
-    # Generate analytics
-    analytics = MoodAnalytics(filtered_df)
-    
     # Report options
     include_charts = st.checkbox("Include chart descriptions", value=True)
     include_insights = st.checkbox("Include insights and patterns", value=True)
     
-    # Generate report
-    report_data = {
-        "report_info": {
-            "generated_on": datetime.now().isoformat(),
-            "date_range": {
-                "start": start_date.isoformat(),
-                "end": end_date.isoformat()
-            },
-            "total_entries": len(filtered_df)
-        },
-        "basic_statistics": {
-            "average_mood": float(filtered_df['mood'].mean()),
-            "median_mood": float(filtered_df['mood'].median()),
-            "std_deviation": float(filtered_df['mood'].std()),
-            "mood_range": int(filtered_df['mood'].max() - filtered_df['mood'].min()),
-            "best_mood_date": filtered_df.loc[filtered_df['mood'].idxmax(), 'date'].isoformat(),
-            "worst_mood_date": filtered_df.loc[filtered_df['mood'].idxmin(), 'date'].isoformat(),
-            "mood_distribution": filtered_df['mood'].value_counts().to_dict()
-        }
-    }
+    # The report runs the whole analytics pipeline, so it is only built on request
+    report_key = (df_version, start_date, end_date, include_insights)
+    if st.button("Generate Report"):
+        st.session_state.report_request = report_key
+        st.session_state.report_generated_on = datetime.now()
     
-    if include_insights:
-        # Add analytics insights
-        mood_trends = analytics.get_mood_trends()
-        weekly_patterns = analytics.get_weekly_patterns()
-        volatility = analytics.get_mood_volatility()
-        streak_analysis = analytics.get_streak_analysis()
+    if st.session_state.get('report_request') == report_key:
+        report_json = build_report(*report_key, st.session_state.report_generated_on)
         
-        report_data["insights"] = {
-            "trend_analysis": {
-                "direction": mood_trends.get('trend_direction', 'unknown'),
-                "recent_average": float(mood_trends.get('recent_average', 0)),
-                "previous_average": float(mood_trends.get('previous_average', 0))
-            },
-            "volatility_analysis": {
-                "stability_score": float(volatility.get('stability_score', 0)),
-                "volatility_category": volatility.get('volatility_category', 'unknown'),
-                "average_daily_change": float(volatility.get('average_daily_change', 0))
-            },
-            "streak_analysis": {
-                "longest_streak": streak_analysis.get('longest_streak', 0),
-                "average_streak": float(streak_analysis.get('average_streak', 0)),
-                "consistency_score": float(streak_analysis.get('consistency_score', 0))
-            }
-        }
+        # Show preview
+        st.write("**Report Preview:**")
+        preview_lines = report_json.split(b'\n', 20)[:20]
+        st.code(b'\n'.join(preview_lines).decode('utf-8') + "\n..." if len(preview_lines) == 20 else report_json.decode('utf-8'), 
+                language="json")
         
-        if weekly_patterns.get('weekday_averages') is not None:
-            weekday_dict = {}
-            for day, stats in weekly_patterns['weekday_averages'].iterrows():
-                weekday_dict[day] = {
-                    "average_mood": float(stats['mean']),
-                    "entry_count": int(stats['count'])
-                }
-            report_data["insights"]["weekly_patterns"] = weekday_dict
-    
-    # Add raw data
-    raw_data = []
-    for _, row in filtered_df.iterrows():
-        raw_data.append({
-            "date": row['date'].isoformat(),
-            "mood": int(row['mood']),
-            "journal": row['journal'],
-            "journal_word_count": len(row['journal'].split()) if row['journal'] else 0
-        })
-    
-    report_data["entries"] = raw_data
-    
-    # Convert to JSON
-    report_json = json.dumps(report_data, indent=2, default=str)
-    
-    # Show preview
-    st.write("**Report Preview:**")
-    preview_lines = report_json.split('\n')[:20]
-    st.code('\n'.join(preview_lines) + "\n..." if len(preview_lines) == 20 else report_json, 
-            language="json")
-    
-    # Download button
-    st.download_button(
-        label="💾 Download Analytics Report",
-        data=report_json,
-        file_name=f"mood_analytics_report_{start_date}_{end_date}.json",
-        mime="application/json",
-        key="analytics_download"
-    )
+        # Download button
+        st.download_button(
+            label="💾 Download Analytics Report",
+            data=report_json,
+            file_name=f"mood_analytics_report_{start_date}_{end_date}.json",
+            mime="application/json",
+            key="analytics_download"
+        )
 
 with tab4:
     st.subheader("📄 Text Summary")
@@ -253,88 +375,28 @@ with tab4:
     include_entries = st.checkbox("Include all entries", value=False)
     include_journal_excerpts = st.checkbox("Include journal excerpts", value=True)
     
-    # Generate text summary
-    summary_lines = []
-    
-    # Header
-    summary_lines.append("MOOD TRACKING SUMMARY")
-    summary_lines.append("=" * 50)
-    summary_lines.append(f"Generated on: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}")
-    summary_lines.append(f"Period: {start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}")
-    summary_lines.append(f"Total entries: {len(filtered_df)}")
-    summary_lines.append("")
-    
-    if include_stats:
-        # Statistics section
-        summary_lines.append("STATISTICS")
-        summary_lines.append("-" * 20)
-        summary_lines.append(f"Average mood: {filtered_df['mood'].mean():.1f}/5")
-        summary_lines.append(f"Highest mood: {filtered_df['mood'].max()}/5")
-        summary_lines.append(f"Lowest mood: {filtered_df['mood'].min()}/5")
-        summary_lines.append(f"Most stable period: {filtered_df['mood'].std():.2f} standard deviation")
-        summary_lines.append("")
-        
-        # Mood distribution
-        summary_lines.append("MOOD DISTRIBUTION")
-        summary_lines.append("-" * 20)
-        mood_emojis = {1: "😢", 2: "😕", 3: "😐", 4: "😊", 5: "😄"}
-        mood_counts = filtered_df['mood'].value_counts().sort_index()
-        
-        for mood, count in mood_counts.items():
-            percentage = (count / len(filtered_df)) * 100
-            emoji = mood_emojis.get(mood, '😐')
-            summary_lines.append(f"{emoji} {mood}/5: {count} entries ({percentage:.1f}%)")
-        summary_lines.append("")
+    # Built on request too; long histories make "Include all entries" expensive
+    summary_key = (df_version, start_date, end_date, include_stats, include_entries, include_journal_excerpts)
+    if st.button("Generate Summary"):
+        st.session_state.summary_request = summary_key
+        st.session_state.summary_generated_on = datetime.now()
     
-    if include_entries:
-        # All entries
-        summary_lines.append("ALL ENTRIES")
-        summary_lines.append("-" * 20)
+    if st.session_state.get('summary_request') == summary_key:
+        summary_text = build_text_summary(*summary_key, st.session_state.summary_generated_on)
         
-        for _, entry in filtered_df.sort_values('date').iterrows():
-            mood_emoji = {1: "😢", 2: "😕", 3: "😐", 4: "😊", 5: "😄"}.get(entry['mood'], '😐')
-            entry_date = entry['date'].strftime('%B %d, %Y')
-            summary_lines.append(f"{entry_date} - {mood_emoji} {entry['mood']}/5")
-            
-            if entry['journal'] and include_journal_excerpts:
-                # Truncate long journal entries
-                journal_text = entry['journal'][:200] + "..." if len(entry['journal']) > 200 else entry['journal']
-                summary_lines.append(f"  Journal: {journal_text}")
-            summary_lines.append("")
-    else:
-        # Just highlights
-        best_day = filtered_df.loc[filtered_df['mood'].idxmax()]
-        worst_day = filtered_df.loc[filtered_df['mood'].idxmin()]
-        
-        summary_lines.append("HIGHLIGHTS")
-        summary_lines.append("-" * 20)
-        summary_lines.append(f"Best day: {best_day['date'].strftime('%B %d, %Y')} ({best_day['mood']}/5)")
-        if best_day['journal'] and include_journal_excerpts:
-            journal_excerpt = best_day['journal'][:150] + "..." if len(best_day['journal']) > 150 else best_day['journal']
-            summary_lines.append(f"  '{journal_excerpt}'")
+        # Show preview
+        st.write("**Summary Preview:**")
+        preview_lines = summary_text.split('\n')[:30]
+        st.text('\n'.join(preview_lines) + "\n..." if len(preview_lines) == 30 else summary_text)
         
-        summary_lines.append(f"Worst day: {worst_day['date'].strftime('%B %d, %Y')} ({worst_day['mood']}/5)")
-        if worst_day['journal'] and include_journal_excerpts:
-            journal_excerpt = worst_day['journal'][:150] + "..." if len(worst_day['journal']) > 150 else worst_day['journal']
-            summary_lines.append(f"  '{journal_excerpt}'")
-        summary_lines.append("")
-    
-    # Join all lines
-    summary_text = '\n'.join(summary_lines)
-    
-    # Show preview
-    st.write("**Summary Preview:**")
-    preview_lines = summary_text.split('\n')[:30]
-    st.text('\n'.join(preview_lines) + "\n..." if len(preview_lines) == 30 else summary_text)
-    
-    # Download button
-    st.download_button(
-        label="💾 Download Text Summary",
-        data=summary_text,
-        file_name=f"mood_summary_{start_date}_{end_date}.txt",
-        mime="text/plain",
-        key="summary_download"
-    )
+        # Download button
+        st.download_button(
+            label="💾 Download Text Summary",
+            data=summary_text,
+            file_name=f"mood_summary_{start_date}_{end_date}.txt",
+            mime="text/plain",
+            key="summary_download"
+        )
 
 # Backup and restore
 st.header("💾 Backup & Restore")
@@ -354,17 +416,15 @@ with col1:
                 "version": "1.0",
                 "total_entries": len(all_data)
             },
-            "data": []
+            "data": pd.DataFrame({
+                "date": all_data['date'].dt.strftime('%Y-%m-%d'),
+                "mood": all_data['mood'].astype(int),
+                "journal": all_data['journal'].fillna('')
+            }).to_dict(orient='records')
         }
         
-        for _, row in all_data.iterrows():
-            backup_data["data"].append({
-                "date": row['date'].isoformat(),
-                "mood": int(row['mood']),
-                "journal": row['journal']
-            })
-        
-        backup_json = json.dumps(backup_data, indent=2)
+        # Compact output: the backup is for machines, and indenting every entry doubles its size
+        backup_json = dumps_json(backup_data)
         
         st.download_button(
             label="💾 Download Complete Backup",
@@ -402,10 +462,8 @@ with col2:
     st.metric("Date Coverage", f"{coverage:.1f}%")
 
 with col3:
-    journal_entries = len(filtered_df[filtered_df['journal'].str.len() > 0])
-    journal_rate = (journal_entries / len(filtered_df)) * 100
+    journal_rate = has_journal.mean() * 100
     st.metric("With Journal", f"{journal_rate:.1f}%")
 
 with col4:
-    total_words = filtered_df['journal'].str.split().str.len().sum()
-    st.metric("Total Words", int(total_words) if pd.notna(total_words) else 0)
+    st.metric("Total Words", int(journal_word_counts.sum()))
@@ -1,12 +1,62 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from functools import wraps
 import streamlit as st
 
+# Upper bounds (exclusive) of each standard-deviation band and the band labels
+VOLATILITY_THRESHOLDS = np.array([0.5, 1.0, 1.5, 2.0])
+VOLATILITY_LABELS = ("Very Stable", "Stable", "Moderate", "Variable", "Highly Variable")
+
+def running_mean(values, window):
+    """Trailing moving average over a window, using partial windows at the start"""
+    values = np.asarray(values, dtype=np.float64)
+    sums = np.cumsum(values)
+    
+    # Subtract the running sum that has left the window: O(n) for any window size
+    window_sums = sums.copy()
+    window_sums[window:] -= sums[:-window]
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    
+    return window_sums / counts
+
+def memoized(method):
+    """Compute an analysis once per MoodAnalytics instance and reuse the result"""
+    @wraps(method)
+    def wrapper(self):
+        if method.__name__ not in self._results:
+            self._results[method.__name__] = method(self)
+        return self._results[method.__name__]
+    return wrapper
+
 class MoodAnalytics:
     def __init__(self, dataframes):
         self.df = dataframes
+        self._results = {}
+    
+    @memoized
+    def get_summary_statistics(self):
+        """Summarize the mood column from a single array fetch"""
+        if self.df.empty:
+            return {}
+        
+        moods = self.df['mood'].to_numpy()
+        dates = self.df['date']
+        best, worst = moods.argmax(), moods.argmin()
+        
+        return {
+            'total_entries': moods.size,
+            'average_mood': moods.mean(),
+            'median_mood': np.median(moods),
+            'std_deviation': moods.std(ddof=1) if moods.size > 1 else np.nan,
+            'most_common_mood': int(np.bincount(moods).argmax()),
+            'best_mood': moods[best],
+            'worst_mood': moods[worst],
+            'best_mood_date': dates.iloc[best].date(),
+            'worst_mood_date': dates.iloc[worst].date()
+        }
     
+    @memoized
     def get_mood_trends(self):
         """Calculate mood trends over time"""
         if self.df.empty:
@@ -16,12 +66,15 @@ class MoodAnalytics:
         df_sorted = self.df.sort_values('date')
         
         # Calculate moving averages
-        df_sorted['mood_7day_avg'] = df_sorted['mood'].rolling(window=7, min_periods=1).mean()
-        df_sorted['mood_30day_avg'] = df_sorted['mood'].rolling(window=30, min_periods=1).mean()
+        moods = df_sorted['mood'].to_numpy()
+        df_sorted['mood_7day_avg'] = running_mean(moods, 7)
+        df_sorted['mood_30day_avg'] = running_mean(moods, 30)
         
         # Calculate trend direction
-        recent_avg = df_sorted['mood'].tail(7).mean()
-        previous_avg = df_sorted['mood'].tail(14).head(7).mean() if len(df_sorted) >= 14 else recent_avg
+        # Both weekly means come from one slice of the last two weeks of the mood array
+        last_two_weeks = moods[-14:]
+        recent_avg = last_two_weeks[-7:].mean()
+        previous_avg = last_two_weeks[:7].mean() if last_two_weeks.size == 14 else recent_avg
         
         trend_direction = "stable"
         if recent_avg > previous_avg + 0.2:
@@ -36,19 +89,17 @@ class MoodAnalytics:
             'data_with_averages': df_sorted
         }
     
+    @memoized
     def get_weekly_patterns(self):
         """Analyze mood patterns by day of week"""
         if self.df.empty:
             return {}
         
-        df_with_weekday = self.df.copy()
-        df_with_weekday['weekday'] = pd.to_datetime(df_with_weekday['date']).dt.day_name()
-        
-        weekday_stats = df_with_weekday.groupby('weekday')['mood'].agg(['mean', 'count']).round(2)
-        
-        # Reorder by actual weekday order
-        weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        weekday_stats = weekday_stats.reindex([day for day in weekday_order if day in weekday_stats.index])
+        # Group by the derived column directly rather than adding it to a copy of the frame
+        weekday = self.df['weekday_name'].rename('weekday')
+        # weekday_name is an ordered categorical, so groups come out in weekday order;
+        # observed=True leaves out days with no entries
+        weekday_stats = self.df['mood'].groupby(weekday, observed=True).agg(['mean', 'count']).round(2)
         
         return {
             'weekday_averages': weekday_stats,
@@ -56,75 +107,72 @@ class MoodAnalytics:
             'worst_day': weekday_stats['mean'].idxmin() if not weekday_stats.empty else None
         }
     
+    @memoized
     def get_monthly_patterns(self):
         """Analyze mood patterns by month"""
         if self.df.empty:
             return {}
         
-        df_with_month = self.df.copy()
-        df_with_month['month'] = pd.to_datetime(df_with_month['date']).dt.strftime('%B')
-        df_with_month['month_num'] = pd.to_datetime(df_with_month['date']).dt.month
-        
-        monthly_stats = df_with_month.groupby(['month', 'month_num'])['mood'].agg(['mean', 'count']).round(2)
-        monthly_stats = monthly_stats.sort_values('month_num')
+        month = self.df['month_name'].rename('month')
+        # month_name is an ordered categorical, so one key groups and orders by calendar month
+        monthly_stats = self.df['mood'].groupby(month, observed=True).agg(['mean', 'count']).round(2)
         
         return {
             'monthly_averages': monthly_stats,
-            'best_month': monthly_stats['mean'].idxmax()[0] if not monthly_stats.empty else None,
-            'worst_month': monthly_stats['mean'].idxmin()[0] if not monthly_stats.empty else None
+            'best_month': monthly_stats['mean'].idxmax() if not monthly_stats.empty else None,
+            'worst_month': monthly_stats['mean'].idxmin() if not monthly_stats.empty else None
         }
     
+    @memoized
     def get_mood_correlations(self):
         """Find correlations between mood and other factors"""
         if self.df.empty:
             return {}
         
-        df_analysis = self.df.copy()
-        df_analysis['date_dt'] = pd.to_datetime(df_analysis['date'])
-        df_analysis['day_of_week'] = df_analysis['date_dt'].dt.dayofweek
-        df_analysis['day_of_month'] = df_analysis['date_dt'].dt.day
-        df_analysis['month'] = df_analysis['date_dt'].dt.month
-        df_analysis['journal_length'] = df_analysis['journal'].str.len().fillna(0)
-        
-        correlations = {
-            'day_of_week': df_analysis[['mood', 'day_of_week']].corr().iloc[0, 1],
-            'day_of_month': df_analysis[['mood', 'day_of_month']].corr().iloc[0, 1],
-            'month': df_analysis[['mood', 'month']].corr().iloc[0, 1],
-            'journal_length': df_analysis[['mood', 'journal_length']].corr().iloc[0, 1]
-        }
+        # A correlation needs at least two entries; with fewer, every coefficient is undefined
+        if len(self.df) < 2:
+            return {}
+        
+        # One correlation matrix over all factors instead of a pandas .corr() per pair
+        factors = ['day_of_week', 'day_of_month', 'month', 'journal_length']
+        columns = np.column_stack([
+            self.df['mood'].to_numpy(dtype=np.float64),
+            self.df['weekday_num'].to_numpy(),
+            self.df['date'].dt.day.to_numpy(),
+            self.df['month_num'].to_numpy(),
+            self.df['journal_length'].to_numpy()
+        ])
+        # A constant factor has no variance, which leaves its coefficient NaN as .corr() did
+        with np.errstate(divide='ignore', invalid='ignore'):
+            coefficients = np.corrcoef(columns, rowvar=False)[0, 1:]
+        correlations = dict(zip(factors, coefficients))
         
         return {k: v for k, v in correlations.items() if not pd.isna(v)}
     
+    @memoized
     def get_streak_analysis(self):
         """Analyze logging streaks and patterns"""
         if self.df.empty:
             return {}
         
-        df_sorted = self.df.sort_values('date')
-        dates = df_sorted['date'].tolist()
-        
-        # Find all streaks
-        streaks = []
-        current_streak = 1
+        days = np.sort(self.df['date'].to_numpy().astype('datetime64[D]'))
+        n = len(days)
         
-        for i in range(1, len(dates)):
-            if (dates[i] - dates[i-1]).days == 1:
-                current_streak += 1
-            else:
-                if current_streak > 1:
-                    streaks.append(current_streak)
-                current_streak = 1
+        # Find all streaks: a run of consecutive days ends wherever the next gap isn't one day
+        run_ends = np.flatnonzero(np.diff(days) != np.timedelta64(1, 'D'))
+        run_lengths = np.diff(np.concatenate(([-1], run_ends, [n - 1])))
+        streaks = run_lengths[run_lengths > 1]
         
-        if current_streak > 1:
-            streaks.append(current_streak)
+        span_days = (days[-1] - days[0]) // np.timedelta64(1, 'D') + 1
         
         return {
-            'longest_streak': max(streaks) if streaks else 1,
-            'average_streak': np.mean(streaks) if streaks else 1,
-            'total_streaks': len(streaks),
-            'consistency_score': len(dates) / ((dates[-1] - dates[0]).days + 1) if len(dates) > 1 else 1
+            'longest_streak': int(streaks.max()) if streaks.size else 1,
+            'average_streak': float(streaks.mean()) if streaks.size else 1,
+            'total_streaks': int(streaks.size),
+            'consistency_score': n / int(span_days) if n > 1 else 1
         }
     
+    @memoized
     def get_mood_volatility(self):
         """Calculate mood volatility/stability metrics"""
         if self.df.empty or len(self.df) < 2:
@@ -137,7 +185,8 @@ class MoodAnalytics:
         range_val = mood_values.max() - mood_values.min()
         
         # Calculate daily changes
-        daily_changes = mood_values.diff().abs().dropna()
+        # Moods are stored as int8, whose diff() is float32; widen first so the mean is float64
+        daily_changes = mood_values.astype('float64').diff().abs().dropna()
         avg_daily_change = daily_changes.mean()
         
         # Stability score (inverse of normalized volatility)
@@ -154,13 +203,5 @@ class MoodAnalytics:
     
     def _categorize_volatility(self, std_dev):
         """Categorize mood volatility"""
-        if std_dev < 0.5:
-            return "Very Stable"
-        elif std_dev < 1.0:
-            return "Stable"
-        elif std_dev < 1.5:
-            return "Moderate"
-        elif std_dev < 2.0:
-            return "Variable"
-        else:
-            return "Highly Variable"
+        # side='right' puts a value equal to a threshold in the band above it
+        return VOLATILITY_LABELS[np.searchsorted(VOLATILITY_THRESHOLDS, std_dev, side='right')]
@@ -4,6 +4,7 @@ from datetime import date, datetime
 import os
 from utils.data_manager import DataManager
 from utils.visualizations import create_mood_chart, create_mood_distribution
+from utils.constants import MOOD_EMOJI, mood_label
 
 # Page configuration
 st.set_page_config(
@@ -20,6 +21,11 @@ def get_data_manager():
 
 data_manager = get_data_manager()
 
+# The trend chart only changes when an entry is saved, so reruns reuse the built figure
+@st.cache_data(ttl=600)
+def build_recent_trend_chart(df_version):
+    return create_mood_chart(data_manager.load_data().tail(7), chart_type="line")
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
@@ -58,8 +64,7 @@ def main():
             st.info(f"You've already logged your mood for today ({today})")
             
             # Display existing entry
-            mood_emojis = {1: "😢", 2: "😕", 3: "😐", 4: "😊", 5: "😄"}
-            st.markdown(f"**Mood Rating:** {existing_entry['mood']}/5 {mood_emojis.get(existing_entry['mood'], '😐')}")
+            st.markdown(f"**Mood Rating:** {existing_entry['mood']}/5 {MOOD_EMOJI[existing_entry['mood']]}")
             st.markdown(f"**Journal Entry:**")
             st.text_area("Journal Entry", value=existing_entry['journal'], disabled=True, height=100, label_visibility="collapsed")
             
@@ -77,7 +82,7 @@ def main():
                     "Rate your mood (1 = Very Bad, 5 = Excellent)",
                     options=[1, 2, 3, 4, 5],
                     value=3,
-                    format_func=lambda x: f"{x} {'😢' if x==1 else '😕' if x==2 else '😐' if x==3 else '😊' if x==4 else '😄'}"
+                    format_func=mood_label
                 )
                 
                 # Journal entry
@@ -131,7 +136,7 @@ def main():
             # Quick mood chart
             st.subheader("Recent Mood Trend")
             if len(recent_entries) >= 2:
-                fig = create_mood_chart(recent_entries, chart_type="line")
+                fig = build_recent_trend_chart(data_manager.get_version())
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Log more entries to see your mood trend!")
@@ -143,13 +148,16 @@ def main():
     if not df.empty:
         recent_df = df.tail(5).sort_values('date', ascending=False)
         
-        for _, entry in recent_df.iterrows():
-            with st.expander(f"{entry['date']} - Mood: {entry['mood']}/5"):
-                mood_emojis = {1: "😢", 2: "😕", 3: "😐", 4: "😊", 5: "😄"}
-                mood_rating = int(entry['mood'])
-                st.markdown(f"**Mood:** {mood_rating}/5 {mood_emojis.get(mood_rating, '😐')}")
-                if entry['journal']:
-                    st.markdown(f"**Journal:** {entry['journal']}")
+        recent_entries = zip(
+            recent_df['date'].dt.date.to_numpy(),
+            recent_df['mood'].to_numpy(),
+            recent_df['journal'].to_numpy()
+        )
+        for entry_date, mood_rating, journal in recent_entries:
+            with st.expander(f"{entry_date} - Mood: {mood_rating}/5"):
+                st.markdown(f"**Mood:** {mood_rating}/5 {MOOD_EMOJI[mood_rating]}")
+                if journal:
+                    st.markdown(f"**Journal:** {journal}")
                 else:
                     st.markdown("*No journal entry for this day*")
     else:
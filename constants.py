@@ -0,0 +1,8 @@
+# Mood display lookups, indexed directly by the 1-5 mood rating.
+# Slot 0 holds the fallback used for anything unrated.
+MOOD_EMOJI = ('😐', '😢', '😕', '😐', '😊', '😄')
+MOOD_COLOR = ('#ddd', '#ff4444', '#ff8844', '#ffdd44', '#88dd44', '#44dd44')
+
+# Widget labels such as '4 😊', built once so a format_func is a plain tuple lookup
+MOOD_LABELS = tuple(f"{mood} {MOOD_EMOJI[mood]}" for mood in range(6))
+mood_label = MOOD_LABELS.__getitem__
@@ -1,14 +1,73 @@
+import atexit
 import csv
+import json
 import pandas as pd
+import numpy as np
 import os
-from datetime import date, datetime, timedelta
+import threading
+import time
+import weakref
+from datetime import date
 import streamlit as st
 
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # optional; without it the CSV is parsed on every reload
+    pa = feather = None
+
+# Ordered so grouping by weekday comes out Monday-first, on small integer codes
+WEEKDAY_DTYPE = pd.CategoricalDtype(
+    ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+    ordered=True
+)
+MONTH_DTYPE = pd.CategoricalDtype(
+    ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+     'August', 'September', 'October', 'November', 'December'],
+    ordered=True
+)
+
+# New rows are buffered and appended in one write once either limit is reached.
+# Every page and session shares one DataManager through st.cache_resource, so
+# buffered rows show up in the cache at once, but they only reach the CSV on a
+# flush; the default of one row writes each entry straight through, so a killed
+# process can't lose saves.
+FLUSH_ROWS = 1
+FLUSH_SECONDS = 5.0
+
+# Live managers, held weakly so the exit hook doesn't keep discarded ones alive
+_managers = weakref.WeakSet()
+
+def _flush_all():
+    """Write out every live manager's buffered rows before the interpreter exits"""
+    for manager in list(_managers):
+        manager.flush()
+
+atexit.register(_flush_all)
+
+# Bump whenever _prepare's columns or dtypes change, so older snapshots are ignored
+SNAPSHOT_SCHEMA = 1
+
 class DataManager:
     def __init__(self, filename="mood_log.csv"):
         self.filename = filename
         self.columns = ['date', 'mood', 'journal']
+        # Typed copy of the prepared frame, so a reparse can skip parsing the CSV
+        self._snapshot = os.path.splitext(filename)[0] + '.feather'
+        # Parsed copy of the CSV, the file version it was read at, its entries
+        # keyed by date, and rows appended to the file that haven't been merged in yet
+        self._cache = None
+        self._mtime = None
+        self._by_date = {}
+        self._pending = []
+        # New rows saved but not yet written to the file
+        self._unwritten = []
+        self._last_flush = time.monotonic()
+        # Sessions run in their own script threads against this one shared instance;
+        # reentrant because saving refreshes and flushes under the same lock
+        self._lock = threading.RLock()
         self._ensure_file_exists()
+        _managers.add(self)
     
     def _ensure_file_exists(self):
         """Create CSV file with headers if it doesn't exist"""
@@ -19,59 +78,215 @@ class DataManager:
     
     def save_entry(self, entry_date, mood, journal=""):
         """Save or update a mood entry"""
+        with self._lock:
+            try:
+                self._ensure_file_exists()
+                self._refresh()
+                
+                entry_date = pd.Timestamp(entry_date)
+                
+                # Check if entry for this date already exists
+                if entry_date in self._by_date:
+                    # Updating an entry in place needs a full rewrite
+                    self._by_date[entry_date].update(mood=mood, journal=journal)
+                    df = self._cache
+                    df.loc[df['date'] == entry_date, 'mood'] = mood
+                    df.loc[df['date'] == entry_date, 'journal'] = journal
+                    df.loc[df['date'] == entry_date, 'journal_length'] = len(journal)
+                    df.to_csv(self.filename, index=False, columns=self.columns)
+                    self._cache = df.reset_index(drop=True)
+                    # The rewrite came from the cache, which already holds any buffered rows
+                    self._unwritten = []
+                    self._last_flush = time.monotonic()
+                    # The cache already reflects this write, so don't reparse because of it
+                    self._mtime = self._file_version()
+                else:
+                    # A new date only needs its own row appended to the file
+                    self._unwritten.append([entry_date.strftime('%Y-%m-%d'), mood, journal])
+                    entry = {'date': entry_date, 'mood': mood, 'journal': journal}
+                    self._pending.append(entry)
+                    self._by_date[entry_date] = entry
+                    if len(self._unwritten) >= FLUSH_ROWS or self._flush_overdue():
+                        self.flush()
+                
+                return True
+                
+            except Exception as e:
+                st.error(f"Error saving entry: {str(e)}")
+                return False
+    
+    def __del__(self):
+        # A manager dropped from Streamlit's resource cache still writes what it buffered
         try:
-            # Load existing data
-            df = self.load_data()
-            
-            # Check if entry for this date already exists
-            date_str = entry_date.isoformat() if isinstance(entry_date, date) else entry_date
-            
-            if not df.empty and date_str in df['date'].values:
-                # Update existing entry
-                df.loc[df['date'] == date_str, 'mood'] = mood
-                df.loc[df['date'] == date_str, 'journal'] = journal
-            else:
-                # Add new entry
-                new_entry = pd.DataFrame({
-                    'date': [date_str],
-                    'mood': [mood],
-                    'journal': [journal]
-                })
-                df = pd.concat([df, new_entry], ignore_index=True)
-            
-            # Save back to CSV
-            df.to_csv(self.filename, index=False)
-            return True
-            
-        except Exception as e:
-            st.error(f"Error saving entry: {str(e)}")
-            return False
+            self.flush()
+        except Exception:
+            pass
+    
+    def _flush_overdue(self):
+        """Whether buffered rows have waited longer than FLUSH_SECONDS"""
+        return bool(self._unwritten) and time.monotonic() - self._last_flush >= FLUSH_SECONDS
+    
+    def flush(self):
+        """Append any buffered rows to the CSV in a single write"""
+        with self._lock:
+            if not self._unwritten:
+                return
+            # Swap the buffer out under the lock; a failed write puts the rows back
+            rows, self._unwritten = self._unwritten, []
+            version = self._file_version()
+            try:
+                with open(self.filename, 'a', newline='', encoding='utf-8') as file:
+                    writer = csv.writer(file)
+                    writer.writerows(rows)
+            except Exception:
+                self._unwritten = rows + self._unwritten
+                raise
+            self._last_flush = time.monotonic()
+            # The cache already holds these rows; only skip the reparse if nobody else wrote meanwhile
+            if version == self._mtime:
+                self._mtime = self._file_version()
+    
+    def _prepare(self, df):
+        """Normalize column types, derive journal lengths and calendar fields, and sort by date"""
+        # Empty frames get the same columns and dtypes, so callers needn't special-case them
+        df['date'] = pd.to_datetime(df['date']).astype('datetime64[ns]')
+        # Ratings are 1-5, so int8 is an eighth of the default int64
+        df['mood'] = df['mood'].astype('int8')
+        # read_csv turns empty journals into NaN; keep them as '' like freshly saved rows
+        df['journal'] = df['journal'].fillna('').astype(str)
+        df['journal_length'] = df['journal'].str.len().astype('int32')
+        # Calendar fields the analytics and charts group by, derived once per load
+        df['weekday_num'] = df['date'].dt.dayofweek.astype('int8')
+        df['weekday_name'] = pd.Categorical.from_codes(df['weekday_num'], dtype=WEEKDAY_DTYPE)
+        df['month_num'] = df['date'].dt.month.astype('int8')
+        df['month_name'] = pd.Categorical.from_codes(df['month_num'] - 1, dtype=MONTH_DTYPE)
+        df['year_month'] = df['date'].dt.to_period('M')
+        df['iso_week'] = df['date'].dt.isocalendar().week.astype('int8')
+        df = df.sort_values('date')
+        return df
+    
+    def _refresh(self):
+        """Bring the cached frame up to date with the CSV and any rows appended since"""
+        with self._lock:
+            # Rows past the time limit go out on the next read, not just the next save
+            if self._flush_overdue():
+                self.flush()
+            # Only reparse when the file has been written by someone else since the last read
+            version = self._file_version()
+            if self._cache is None or version != self._mtime:
+                # Buffered rows go into the file first, or rereading it would drop them
+                if self._unwritten:
+                    self.flush()
+                    version = self._file_version()
+                stamp = self._csv_stamp()
+                self._cache = self._load_snapshot(stamp)
+                if self._cache is None:
+                    # The schema is fixed, so give it to the parser instead of letting it infer types
+                    self._cache = self._prepare(pd.read_csv(
+                        self.filename,
+                        usecols=self.columns,
+                        dtype={'mood': 'int8', 'journal': str},
+                        parse_dates=['date'],
+                        date_format='%Y-%m-%d'
+                    ))
+                    self._save_snapshot(stamp)
+                self._by_date = {
+                    entry_date: {'date': entry_date, 'mood': mood, 'journal': journal}
+                    for entry_date, mood, journal in zip(
+                        self._cache['date'].tolist(),
+                        self._cache['mood'].tolist(),
+                        self._cache['journal'].tolist()
+                    )
+                }
+                self._pending = []
+                self._mtime = version
+            elif self._pending:
+                # Appended rows are collected as dicts and concatenated once, labelled by file position
+                start = len(self._cache)
+                appended = pd.DataFrame(self._pending, columns=self.columns,
+                                        index=range(start, start + len(self._pending)))
+                self._cache = self._prepare(pd.concat([self._cache, appended]))
+                self._pending = []
+    
+    def _csv_stamp(self):
+        """Identify the CSV contents a snapshot was built from"""
+        mtime_ns, size = self._file_version()
+        return {'schema': SNAPSHOT_SCHEMA, 'mtime_ns': mtime_ns, 'size': size}
+    
+    def _load_snapshot(self, stamp):
+        """Return the prepared frame saved for this CSV, or None if there is no matching snapshot"""
+        if feather is None or not os.path.exists(self._snapshot):
+            return None
+        try:
+            table = feather.read_table(self._snapshot)
+            saved = json.loads((table.schema.metadata or {}).get(b'mood_tracker', b'null'))
+            if saved != stamp:
+                return None
+            df = table.to_pandas().set_index('index').rename_axis(None)
+            # Anything but exactly the columns and dtypes _prepare produces is rebuilt from the CSV
+            expected = self._prepare(pd.DataFrame([], columns=self.columns))
+            if list(df.columns) != list(expected.columns) or not df.dtypes.equals(expected.dtypes):
+                return None
+            return df
+        except Exception:
+            return None
+    
+    def _save_snapshot(self, stamp):
+        """Save the prepared frame as Feather, tagged with the CSV it was parsed from"""
+        # Feather drops the categories of an empty categorical, and there's nothing to save anyway
+        if feather is None or self._cache.empty:
+            return
+        try:
+            table = pa.Table.from_pandas(self._cache.reset_index())
+            metadata = dict(table.schema.metadata or {})
+            metadata[b'mood_tracker'] = json.dumps(stamp).encode()
+            feather.write_feather(table.replace_schema_metadata(metadata), self._snapshot)
+        except Exception:
+            # The snapshot only saves a parse; without it the CSV is simply read again
+            pass
     
     def load_data(self):
         """Load all mood data from CSV"""
         try:
             if os.path.exists(self.filename):
-                df = pd.read_csv(self.filename)
-                if not df.empty:
-                    df['date'] = pd.to_datetime(df['date']).dt.date
-                    df = df.sort_values('date')
-                return df
+                with self._lock:
+                    self._refresh()
+                    # Callers get their own frame, so they can't modify the cache
+                    return self._cache.copy()
             else:
-                return pd.DataFrame([], columns=self.columns)
+                return self._prepare(pd.DataFrame([], columns=self.columns))
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
-            return pd.DataFrame([], columns=self.columns)
+            return self._prepare(pd.DataFrame([], columns=self.columns))
+    
+    def get_version(self):
+        """Return a token that changes whenever an entry is saved"""
+        # Buffered rows haven't reached the file yet, so they count toward the version too
+        with self._lock:
+            return (self._file_version(), len(self._unwritten))
+    
+    def _file_version(self):
+        """Return a token that changes whenever the CSV file is written"""
+        # Size as well as mtime, so an append within the timestamp resolution still counts
+        try:
+            stat = os.stat(self.filename)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return (0, 0)
     
     def get_entry_by_date(self, entry_date):
         """Get entry for a specific date"""
-        df = self.load_data()
-        if df.empty:
+        try:
+            if not os.path.exists(self.filename):
+                return None
+            with self._lock:
+                self._refresh()
+                entry = self._by_date.get(pd.Timestamp(entry_date))
+                # A copy, so callers can't modify the cached entry
+                return dict(entry) if entry else None
+        except Exception as e:
+            st.error(f"Error loading data: {str(e)}")
             return None
-        
-        date_filter = df['date'] == entry_date
-        if date_filter.any():
-            return df[date_filter].iloc[0].to_dict()
-        return None
     
     def get_date_range_data(self, start_date, end_date):
         """Get entries within a date range"""
@@ -79,8 +294,10 @@ class DataManager:
         if df.empty:
             return df
         
-        mask = (df['date'] >= start_date) & (df['date'] <= end_date)
-        return df[mask]
+        # Data is sorted by date, so the range is one contiguous slice
+        start = df['date'].searchsorted(pd.Timestamp(start_date), side='left')
+        end = df['date'].searchsorted(pd.Timestamp(end_date), side='right')
+        return df.iloc[start:end]
     
     def get_current_streak(self):
         """Calculate current consecutive logging streak"""
@@ -88,20 +305,13 @@ class DataManager:
         if df.empty:
             return 0
         
-        # Sort by date descending
-        df_sorted = df.sort_values('date', ascending=False)
-        
-        streak = 0
-        current_date = date.today()
-        
-        for _, entry in df_sorted.iterrows():
-            if entry['date'] == current_date:
-                streak += 1
-                current_date -= timedelta(days=1)
-            else:
-                break
+        # Newest first as day numbers, compared against today, yesterday, ...
+        days = df['date'].to_numpy().astype('datetime64[D]')[::-1]
+        expected = np.datetime64(date.today(), 'D') - np.arange(len(days))
         
-        return streak
+        # The streak is the run of matches before the first gap
+        gaps = np.flatnonzero(days != expected)
+        return int(gaps[0]) if gaps.size else len(days)
     
     def get_mood_statistics(self):
         """Get basic mood statistics"""
@@ -114,8 +324,8 @@ class DataManager:
             'average_mood': df['mood'].mean(),
             'median_mood': df['mood'].median(),
             'mood_distribution': df['mood'].value_counts().to_dict(),
-            'best_mood_date': df.loc[df['mood'].idxmax(), 'date'],
-            'worst_mood_date': df.loc[df['mood'].idxmin(), 'date'],
+            'best_mood_date': df.loc[df['mood'].idxmax(), 'date'].date(),
+            'worst_mood_date': df.loc[df['mood'].idxmin(), 'date'].date(),
             'date_range': {
                 'start': df['date'].min(),
                 'end': df['date'].max()
@@ -138,5 +348,5 @@ class DataManager:
         """Return CSV data for export"""
         df = self.load_data()
         if not df.empty:
-            return df.to_csv(index=False)
+            return df.to_csv(index=False, columns=self.columns)
         return None
@@ -4,6 +4,45 @@ from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from utils.constants import MOOD_EMOJI
+
+# Line charts with more points than this are downsampled before plotting
+DOWNSAMPLE_THRESHOLD = 2000
+DOWNSAMPLE_POINTS = 800
+
+def lttb_indices(x, y, n_out):
+    """Select indices of n_out points that keep the shape of a series (Largest-Triangle-Three-Buckets)"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # Inner points are split into n_out - 2 buckets; the last point closes the final bucket
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.int64), n)
+    
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2]
+        
+        # Keep the point forming the largest triangle with the previously kept
+        # point and the average of the next bucket
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected])
+            - (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(areas.argmax())
+        indices[i + 1] = selected
+    
+    return indices
 
 def create_mood_chart(df, chart_type="line"):
     """Create mood trend chart"""
@@ -14,6 +53,11 @@ def create_mood_chart(df, chart_type="line"):
     fig = None
     
     if chart_type == "line":
+        if len(df_sorted) > DOWNSAMPLE_THRESHOLD:
+            date_values = df_sorted['date'].to_numpy().astype(np.int64)
+            keep = lttb_indices(date_values, df_sorted['mood'].to_numpy(), DOWNSAMPLE_POINTS)
+            df_sorted = df_sorted.iloc[keep]
+        
         fig = px.line(
             df_sorted,
             x='date',
@@ -55,7 +99,7 @@ def create_mood_chart(df, chart_type="line"):
                 dtick=1,
                 tickmode='array',
                 tickvals=[1, 2, 3, 4, 5],
-                ticktext=['😢 1', '😕 2', '😐 3', '😊 4', '😄 5']
+                ticktext=[f"{MOOD_EMOJI[mood]} {mood}" for mood in range(1, 6)]
             )
         )
     
@@ -67,9 +111,7 @@ def create_mood_distribution(df):
         return go.Figure()
     
     mood_counts = df['mood'].value_counts().sort_index()
-    mood_emojis = {1: "😢", 2: "😕", 3: "😐", 4: "😊", 5: "😄"}
-    
-    labels = [f"{mood_emojis.get(mood, '')} {mood}" for mood in mood_counts.index]
+    labels = [f"{MOOD_EMOJI[mood]} {mood}" for mood in mood_counts.index]
     
     fig = px.pie(
         values=mood_counts.values,
@@ -82,17 +124,18 @@ def create_mood_distribution(df):
     
     return fig
 
-def create_weekly_pattern_chart(df):
-    """Create weekly mood pattern chart"""
+def create_weekly_pattern_chart(df, weekday_averages=None):
+    """Create weekly mood pattern chart, optionally from precomputed weekday averages"""
     if df.empty:
         return go.Figure()
     
-    df_with_weekday = df.copy()
-    df_with_weekday['weekday'] = pd.to_datetime(df_with_weekday['date']).dt.day_name()
-    df_with_weekday['weekday_num'] = pd.to_datetime(df_with_weekday['date']).dt.dayofweek
-    
-    weekday_avg = df_with_weekday.groupby(['weekday', 'weekday_num'])['mood'].mean().reset_index()
-    weekday_avg = weekday_avg.sort_values('weekday_num')
+    if weekday_averages is not None:
+        # Reuse the ordered per-weekday table from MoodAnalytics.get_weekly_patterns
+        weekday_avg = weekday_averages['mean'].rename('mood').rename_axis('weekday').reset_index()
+    else:
+        # weekday_name is an ordered categorical, so the groups are already Monday-first
+        weekday = df['weekday_name'].rename('weekday')
+        weekday_avg = df['mood'].groupby(weekday, observed=True).mean().reset_index()
     
     fig = px.bar(
         weekday_avg,
@@ -113,10 +156,7 @@ def create_monthly_trend_chart(df):
     if df.empty:
         return go.Figure()
     
-    df_monthly = df.copy()
-    df_monthly['year_month'] = pd.to_datetime(df_monthly['date']).dt.to_period('M')
-    
-    monthly_stats = df_monthly.groupby('year_month')['mood'].agg(['mean', 'count']).reset_index()
+    monthly_stats = df['mood'].groupby(df['year_month']).agg(['mean', 'count']).reset_index()
     monthly_stats['year_month_str'] = monthly_stats['year_month'].astype(str)
     
     # Create subplot with secondary y-axis
@@ -159,18 +199,11 @@ def create_mood_heatmap(df):
     if df.empty:
         return go.Figure()
     
-    # Prepare data for heatmap
-    df_heatmap = df.copy()
-    df_heatmap['date_dt'] = pd.to_datetime(df_heatmap['date'])
-    df_heatmap['week'] = df_heatmap['date_dt'].dt.isocalendar().week
-    df_heatmap['weekday'] = df_heatmap['date_dt'].dt.dayofweek
-    df_heatmap['year'] = df_heatmap['date_dt'].dt.year
-    
-    # Create pivot table for heatmap
-    heatmap_data = df_heatmap.pivot_table(
+    # Create pivot table for heatmap from the week and weekday columns DataManager derives
+    heatmap_data = df.pivot_table(
         values='mood',
-        index='week',
-        columns='weekday',
+        index='iso_week',
+        columns='weekday_num',
         aggfunc='mean'
     )
     